@@ -2,10 +2,20 @@ import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-from data_loader import get_merged_data
+from data_loader import get_merged_data, get_fng_data, get_btc_data_from_binance
 from backtester import run_backtest, calculate_yearly_metrics, run_multi_start_analysis, optimize_thresholds
 import datetime
 
+try:
+    from tsdownsample import MinMaxDownsampler, MinMaxLTTBDownsampler
+except ImportError:
+    MinMaxDownsampler = MinMaxLTTBDownsampler = None
+
+# Max points per line trace; beyond this Plotly rendering slows down noticeably
+MAX_CHART_POINTS = 1500
+# The FNG area fill only needs its min/max envelope (200 bins x min+max)
+MAX_FILL_POINTS = 400
+
 # Page config
 st.set_page_config(
     page_title="BTC Fear & Greed Backtester",
@@ -52,6 +62,87 @@ st.markdown("""
     </style>
     """, unsafe_allow_html=True)
 
+def downsample_for_chart(df, column, n_out=MAX_CHART_POINTS, downsampler=MinMaxLTTBDownsampler):
+    """
+    Keeps only the rows that preserve the visual shape of `column` (MinMax-LTTB by default).
+    Returns df untouched if it is already small or tsdownsample is not installed.
+    """
+    if downsampler is None or len(df) <= n_out:
+        return df
+    idx = downsampler().downsample(df[column].to_numpy(), n_out=n_out)
+    return df.iloc[idx]
+
+# Data Caching - avoid hitting the APIs on every rerun (slider moves, button presses).
+# The loaders return None on failure; raising instead keeps that None out of the
+# cache (exceptions are not cached), so a failed load is retried on the next rerun.
+class _DataUnavailable(Exception):
+    pass
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _cached_merged_data():
+    df = get_merged_data()
+    if df is None:
+        raise _DataUnavailable()
+    return df
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _cached_fng_data():
+    df = get_fng_data()
+    if df is None:
+        raise _DataUnavailable()
+    return df
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _cached_btc_data():
+    df = get_btc_data_from_binance()
+    if df is None:
+        raise _DataUnavailable()
+    return df
+
+def _load_or_none(cached_loader):
+    """
+    Calls a cached loader, turning a failed (uncached) load back into None.
+    """
+    try:
+        return cached_loader()
+    except _DataUnavailable:
+        return None
+
+# Results Caching - keyed by parameters plus a cheap data signature (df_sig: row count,
+# last date and last day's values);
+# the leading underscore tells Streamlit not to hash the DataFrame itself
+@st.cache_data(max_entries=64, show_spinner=False)
+def _cached_backtest(_df, df_sig, initial_capital, buy_threshold, sell_threshold):
+    stats_df, trades_df = run_backtest(_df, initial_capital, buy_threshold, sell_threshold)
+    return stats_df, trades_df, calculate_yearly_metrics(stats_df)
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def _cached_multi_start(_df, df_sig, initial_capital, buy_threshold, sell_threshold):
+    return run_multi_start_analysis(_df, initial_capital, buy_threshold, sell_threshold)
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def _cached_optimization(_df, df_sig, initial_capital):
+    return optimize_thresholds(_df, initial_capital)
+
+@st.fragment
+def _render_optimizer(df, df_sig, initial_capital):
+    """
+    Optimization section. Runs as a fragment, so pressing its button only reruns this block.
+    """
+    st.markdown("### 🎯 Optimización de Umbrales por Año")
+    if st.button("🔍 Optimizar Parámetros"):
+        st.session_state.optimize = True
+
+    if st.session_state.optimize:
+        with st.spinner("Calculando mejores parámetros..."):
+            opt_df = _cached_optimization(df, df_sig, initial_capital)
+            st.table(opt_df.style.format({
+                "Best Buy Threshold": "{:.0f}",
+                "Best Sell Threshold": "{:.0f}",
+                "Max ROI (%)": "{:,.1f}%"
+            }))
+            st.info("💡 Consejo: Los umbrales que maximizan el ROI cambian según la volatilidad de cada año.")
+
 def main():
     st.title("🚀 Bitcoin Fear & Greed Strategy Dashboard")
     st.markdown("---")
@@ -63,11 +154,8 @@ def main():
     sell_threshold = st.sidebar.slider("Umbral de Venta (FNG Indice >= X)", 0, 100, 90)
     
     st.sidebar.markdown("---")
-    if st.sidebar.button("🔍 Optimizar Parámetros"):
-        st.session_state.optimize = True
-    else:
-        if 'optimize' not in st.session_state:
-            st.session_state.optimize = False
+    if 'optimize' not in st.session_state:
+        st.session_state.optimize = False
 
     st.sidebar.info("""
     **Estrategia:**
@@ -77,13 +165,15 @@ def main():
 
     # Data Fetching
     with st.spinner("Descargando datos actualizados de APIs..."):
-        df = get_merged_data()
+        df = _load_or_none(_cached_merged_data)
 
     if df is not None:
         # Run Backtests
-        stats_df, trades_df = run_backtest(df, initial_capital, buy_threshold, sell_threshold)
-        yearly_df = calculate_yearly_metrics(stats_df)
-        multi_start_df = run_multi_start_analysis(df, initial_capital, buy_threshold, sell_threshold)
+        # The last day is re-fetched while still open, so its values are part of the signature too
+        last = df.iloc[-1]
+        df_sig = (len(df), last['date'].toordinal(), float(last['price']), int(last['fng_value']))
+        stats_df, trades_df, yearly_df = _cached_backtest(df, df_sig, initial_capital, buy_threshold, sell_threshold)
+        multi_start_df = _cached_multi_start(df, df_sig, initial_capital, buy_threshold, sell_threshold)
 
         # Top Metrics
         total_profit = stats_df.iloc[-1]['equity'] - initial_capital
@@ -99,8 +189,10 @@ def main():
         # Main Charts
         st.markdown("### 📊 Evolución del Mercado e Índice")
         fig = make_subplots(specs=[[{"secondary_y": True}]])
-        fig.add_trace(go.Scatter(x=stats_df['date'], y=stats_df['price'], name="Precio BTC", line=dict(color="#FF9900", width=2)), secondary_y=False)
-        fig.add_trace(go.Scatter(x=stats_df['date'], y=stats_df['fng_value'], name="Fear & Greed Index", line=dict(color="rgba(100, 149, 237, 0.4)", width=1), fill='tozeroy'), secondary_y=True)
+        price_plot = downsample_for_chart(stats_df, 'price')
+        fng_plot = downsample_for_chart(stats_df, 'fng_value', MAX_FILL_POINTS, MinMaxDownsampler)
+        fig.add_trace(go.Scattergl(x=price_plot['date'], y=price_plot['price'], name="Precio BTC", line=dict(color="#FF9900", width=2)), secondary_y=False)
+        fig.add_trace(go.Scattergl(x=fng_plot['date'], y=fng_plot['fng_value'], name="Fear & Greed Index", line=dict(color="rgba(100, 149, 237, 0.4)", width=1), fill='tozeroy'), secondary_y=True)
         
         if not trades_df.empty:
             buys = trades_df[trades_df['action'] == 'BUY']
@@ -113,7 +205,8 @@ def main():
 
         st.markdown("### 📈 Crecimiento del Capital")
         fig_equity = go.Figure()
-        fig_equity.add_trace(go.Scatter(x=stats_df['date'], y=stats_df['equity'], name="Equity", line=dict(color="#00D4FF", width=3), fill='tozeroy'))
+        equity_plot = downsample_for_chart(stats_df, 'equity')
+        fig_equity.add_trace(go.Scattergl(x=equity_plot['date'], y=equity_plot['equity'], name="Equity", line=dict(color="#00D4FF", width=3), fill='tozeroy'))
         fig_equity.update_layout(template="plotly_dark", height=400, margin=dict(l=20, r=20, t=30, b=20))
         st.plotly_chart(fig_equity, use_container_width=True)
 
@@ -127,10 +220,8 @@ def main():
                 return f"{int(val):,}" if abs(val) > 10 else f"{val:,.1f}"
             return val
 
-        st.table(multi_start_df.style.format(format_dynamic))
-        
-        # Also clean up the dataframe display below it - Removed highlight
-        st.dataframe(multi_start_df.T.style.format("{:,.0f}"), use_container_width=True)
+        # Plain string frame: skips the Styler's per-cell HTML/CSS pass
+        st.table(multi_start_df.map(format_dynamic))
 
         # Yearly Breakdown
         st.markdown("### 🗓️ Resumen Anual (Estrategia Continua)")
@@ -142,21 +233,13 @@ def main():
         }), use_container_width=True)
 
         # Optimization Section
-        if st.session_state.optimize:
-            st.markdown("### 🎯 Optimización de Umbrales por Año")
-            with st.spinner("Calculando mejores parámetros..."):
-                opt_df = optimize_thresholds(df, initial_capital)
-                st.table(opt_df.style.format({
-                    "Best Buy Threshold": "{:.0f}",
-                    "Best Sell Threshold": "{:.0f}",
-                    "Max ROI (%)": "{:,.1f}%"
-                }))
-                st.info("💡 Consejo: Los umbrales que maximizan el ROI cambian según la volatilidad de cada año.")
+        _render_optimizer(df, df_sig, initial_capital)
 
         # Trade History
         st.markdown("### 📝 Historial de Operaciones")
         if not trades_df.empty:
             st.dataframe(trades_df.style.format({
+                "date": "{:%Y-%m-%d}",
                 "price": "{:,.0f}",
                 "amount_usd": "{:,.0f}",
                 "amount_btc": "{:,.3f}", 
@@ -172,10 +255,8 @@ def main():
         st.subheader("Depuración de Datos")
         
         # Testing individual components
-        from data_loader import get_fng_data, get_btc_data_from_binance
-        
-        fng_test = get_fng_data()
-        btc_test = get_btc_data_from_binance()
+        fng_test = _load_or_none(_cached_fng_data)
+        btc_test = _load_or_none(_cached_btc_data)
         
         if fng_test is not None:
             st.success("✅ Fear & Greed Index: OK")
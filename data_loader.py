@@ -1,9 +1,55 @@
+import numpy as np
 import pandas as pd
 import requests
 from datetime import datetime
 import time
 import os
 import json
+from concurrent.futures import ThreadPoolExecutor
+
+# Binance returns at most 1000 daily klines per request
+KLINES_PER_PAGE = 1000
+DAY_MS = 86400000
+
+def _load_cache(path):
+    """
+    Reads a parquet cache written by _update_cache, or None if unavailable.
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        df = pd.read_parquet(path)
+        df['date'] = pd.to_datetime(df['date'])
+        return df
+    except Exception as e:
+        print(f"Error reading cache {path}: {e}")
+        return None
+
+def _update_cache(path, cached_df, new_df):
+    """
+    Appends freshly fetched rows to the cache (newer rows win on the same date) and saves it.
+    """
+    if cached_df is not None:
+        new_df = pd.concat([cached_df, new_df]).drop_duplicates('date', keep='last')
+    new_df = new_df.sort_values('date').reset_index(drop=True)
+    try:
+        new_df.to_parquet(path, index=False)
+    except Exception as e:
+        print(f"Error writing cache {path}: {e}")
+    return new_df
+
+def _fetch_klines_page(session, endpoints, params):
+    """
+    Fetches one page of klines, trying each Binance endpoint in turn.
+    """
+    for endpoint in endpoints:
+        try:
+            response = session.get(f"{endpoint}/api/v3/klines", params=params, timeout=10)
+            response.raise_for_status()
+            return response.json()
+        except Exception as e:
+            last_error = e
+    raise Exception(f"All Binance endpoints failed: {last_error}")
 
 def get_fng_data():
     """
@@ -15,25 +61,35 @@ def get_fng_data():
     if os.path.exists(json_path):
         try:
             df = pd.read_json(json_path)
-            df['date'] = pd.to_datetime(df['date']).dt.date
+            df['date'] = pd.to_datetime(df['date']).to_numpy(dtype='datetime64[D]')
             return df[['date', 'fng_value', 'fng_classification']]
         except Exception as e:
             print(f"Error reading local FNG JSON: {e}")
 
-    # Fallback to API
-    url = "https://api.alternative.me/fng/?limit=0"
+    # Fallback to API, only fetching the days missing from the local cache
+    cache_path = "fng_data.parquet"
+    cached_df = _load_cache(cache_path)
+    limit = 0 # 0 = full history
+    if cached_df is not None and not cached_df.empty:
+        # Re-fetch the last cached day as well, in case it was still in progress
+        limit = (pd.Timestamp.now().normalize() - cached_df['date'].max()).days + 1
+
+    url = f"https://api.alternative.me/fng/?limit={limit}"
     try:
         response = requests.get(url, timeout=15)
         response.raise_for_status()
         data = response.json()
         df = pd.DataFrame(data['data'])
-        df['date'] = pd.to_datetime(pd.to_numeric(df['timestamp']), unit='s').dt.date
+        # Vectorized epoch seconds -> day conversion, no per-row Python date objects
+        timestamps = pd.to_numeric(df['timestamp']).to_numpy(dtype=np.int64)
+        df['date'] = timestamps.astype('datetime64[s]').astype('datetime64[D]')
         df = df.rename(columns={'value': 'fng_value', 'value_classification': 'fng_classification'})
+        df = _update_cache(cache_path, cached_df, df[['date', 'fng_value', 'fng_classification']])
         return df[['date', 'fng_value', 'fng_classification']]
     except Exception as e:
         error_msg = f"Error fetching FNG data from API: {e}"
         print(error_msg)
-        return None
+        return cached_df[['date', 'fng_value', 'fng_classification']] if cached_df is not None else None
 
 def get_btc_data_from_binance(start_year=2018):
     """
@@ -45,7 +101,7 @@ def get_btc_data_from_binance(start_year=2018):
     if os.path.exists(json_path):
         try:
             df = pd.read_json(json_path)
-            df['date'] = pd.to_datetime(df['date']).dt.date
+            df['date'] = pd.to_datetime(df['date']).to_numpy(dtype='datetime64[D]')
             return df[['date', 'price']]
         except Exception as e:
             print(f"Error reading local BTC JSON: {e}")
@@ -61,39 +117,38 @@ def get_btc_data_from_binance(start_year=2018):
         "https://api-gcp.binance.com"
     ]
     start_time = int(datetime(start_year, 1, 1).timestamp() * 1000)
-    all_klines = []
+
+    # Only fetch the days missing from the local cache
+    cache_path = "btc_data.parquet"
+    cached_df = _load_cache(cache_path)
+    if cached_df is not None and not cached_df.empty:
+        # Restart from the last cached day, its close may have been partial
+        start_time = int(cached_df['date'].max().timestamp() * 1000)
     
     try:
-        current_endpoint_idx = 0
-        while True:
-            params = {'symbol': symbol, 'interval': interval, 'startTime': start_time, 'limit': 1000}
-            url = f"{endpoints[current_endpoint_idx]}/api/v3/klines"
-            try:
-                response = requests.get(url, params=params, timeout=10)
-                response.raise_for_status()
-            except Exception as e:
-                current_endpoint_idx += 1
-                if current_endpoint_idx >= len(endpoints):
-                    raise Exception(f"All Binance endpoints failed: {e}")
-                continue
+        # The page windows are known upfront, so fetch them concurrently over one keep-alive session
+        page_starts = range(start_time, int(time.time() * 1000), KLINES_PER_PAGE * DAY_MS)
+        params_list = [
+            {'symbol': symbol, 'interval': interval, 'startTime': page_start, 'limit': KLINES_PER_PAGE}
+            for page_start in page_starts
+        ]
+        with requests.Session() as session, ThreadPoolExecutor(max_workers=6) as executor:
+            pages = executor.map(lambda params: _fetch_klines_page(session, endpoints, params), params_list)
+            all_klines = [kline for klines in pages for kline in klines]
+
+        if not all_klines and cached_df is not None:
+            return cached_df[['date', 'price']]
 
-            klines = response.json()
-            if not klines: break
-            all_klines.extend(klines)
-            last_timestamp = klines[-1][0]
-            start_time = last_timestamp + 86400000
-            if start_time > int(time.time() * 1000): break
-            time.sleep(0.1)
-            
         df = pd.DataFrame(all_klines)
         df = df[[0, 4]].rename(columns={0: 'timestamp', 4: 'price'})
-        df['date'] = pd.to_datetime(df['timestamp'], unit='ms').dt.date
+        df['date'] = df['timestamp'].to_numpy(dtype=np.int64).astype('datetime64[ms]').astype('datetime64[D]')
         df['price'] = pd.to_numeric(df['price'])
         df = df.groupby('date').last().reset_index()
+        df = _update_cache(cache_path, cached_df, df[['date', 'price']])
         return df[['date', 'price']]
     except Exception as e:
         print(f"Error fetching BTC data from API: {e}")
-        return None
+        return cached_df[['date', 'price']] if cached_df is not None else None
 
 def get_merged_data():
     """
@@ -108,6 +163,13 @@ def get_merged_data():
     merged_df = pd.merge(fng_df, btc_df, on='date', how='inner')
     merged_df = merged_df.sort_values('date')
     
+    # Compact dtypes: FNG fits in int8 (0-100) and float32 is plenty for daily closes
+    merged_df['fng_value'] = pd.to_numeric(merged_df['fng_value']).astype(np.int8)
+    merged_df['price'] = merged_df['price'].astype(np.float32)
+    
+    # Computed once here so the backtester never has to re-parse dates
+    merged_df['year'] = merged_df['date'].dt.year.astype(np.int16)
+    
     return merged_df
 
 if __name__ == "__main__":
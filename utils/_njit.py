@@ -0,0 +1,20 @@
+"""
+Optional Numba support.
+
+Exposes ``njit``. When Numba is not installed it becomes a no-op decorator,
+so the decorated kernels still run as plain Python.
+"""
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+    def njit(*args, **kwargs):
+        # Support both @njit and @njit(...)
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+
+        def decorator(func):
+            return func
+        return decorator